@@ -20,25 +20,248 @@ Future Updates:
 ## Import Modules -----------------------------------------------------------##
 
 # Standard library imports
-from time import sleep
-from datetime import datetime, timedelta  # For date manipulations
+from time import sleep, monotonic
+import queue  # Pool of reusable pytrends clients
+import threading  # Request throttling across worker threads
+from contextlib import contextmanager  # Client checkout from the pool
+from concurrent.futures import ThreadPoolExecutor  # Parallel segment fetches
+import warnings  # Report zero-filled keyword batches
+from datetime import date, datetime  # For date manipulations
 
 # Third-party imports
+import numpy as np  # Vectorized numerical operations
 import pandas as pd  # Data manipulation and analysis
+import matplotlib  # Backend selection
 import matplotlib.pyplot as plt  # Plotting library
 import matplotlib.dates as mdates  # Date formatting for plots
+from matplotlib.collections import LineCollection  # Draw all keyword series as one artist
+from matplotlib.lines import Line2D  # Legend proxies for the line collection
 import mplcursors  # Interactive data selection cursors for Matplotlib
-import seaborn as sns  # Data visualization library based on Matplotlib
+import joblib  # On-disk memoization of Google Trends responses
+from numba import njit  # JIT-compiled segment scaling
 from pytrends.request import TrendReq  # Google Trends API
 
-# Setting up the plotting style
-sns.set()
+## Settings -----------------------------------------------------------------##
+
+# Render figures straight to files, without opening any windows
+SAVE_ONLY = False
+
+if SAVE_ONLY:
+    matplotlib.use('Agg')  # Non-interactive backend; pyplot only loads a GUI toolkit on first use
+
+# Setting up the plotting style: a dark grid matching the '#19232d' figure background
+plt.rcParams.update({
+    'axes.grid': True,
+    'axes.axisbelow': True,
+    'axes.edgecolor': 'white',
+    'axes.linewidth': 1.25,
+    'grid.color': '#2e3b48',
+    'grid.linestyle': '-',
+    'lines.linewidth': 1.5,
+    'lines.solid_capstyle': 'round',
+    'xtick.bottom': False,
+    'ytick.left': False,
+})
 
 # Close previously opened figures
 plt.close('all')
 
+# Google rate-limits aggressively, so every get_data call shares a cap on in-flight requests
+# and a minimum interval between the start of consecutive requests
+MAX_CONCURRENT_REQUESTS = 2
+MIN_REQUEST_INTERVAL = 0.1  # Seconds
+_request_semaphore = threading.Semaphore(MAX_CONCURRENT_REQUESTS)
+_request_lock = threading.Lock()
+_last_request_time = 0.0
+
+# pytrends clients are not thread-safe, so idle clients wait in a pool per (hl, tz)
+# and each fetch checks one out for its exclusive use
+_client_pools = {}
+
+# Google Trends compares at most five keywords per request
+MAX_KEYWORDS_PER_PAYLOAD = 5
+
+# Responses are deterministic per request, so they are cached on disk across runs
+memory = joblib.Memory('.pytrends_cache', verbose=0)
+
 ## Define Functions ---------------------------------------------------------##
 
+@contextmanager
+def checkout_trend_req(hl: str = 'en-US', tz: int = 360):
+    """
+    Function to check out an idle TrendReq instance from the client pool.
+
+    Building a TrendReq performs a round trip to Google to fetch session cookies, so clients
+    are returned to the pool after use and reused across segments and get_data calls. A new
+    client is only built when every pooled one is in use, which MAX_CONCURRENT_REQUESTS bounds.
+
+    Args:
+    - hl (str): The host language used for the requests.
+    - tz (int): The timezone offset in minutes.
+
+    Yields:
+    - TrendReq: A pytrends client reserved for the caller until the block exits.
+    """
+    pool = _client_pools.setdefault((hl, tz), queue.SimpleQueue())
+    try:
+        pytrends = pool.get_nowait()
+    except queue.Empty:
+        wait_for_request_slot()  # Building a client requests session cookies from Google
+        pytrends = TrendReq(hl=hl, tz=tz)
+    try:
+        yield pytrends
+    finally:
+        pool.put(pytrends)
+
+def wait_for_request_slot():
+    """Function to block until MIN_REQUEST_INTERVAL has passed since the previous request started."""
+    global _last_request_time
+    with _request_lock:
+        delay = _last_request_time + MIN_REQUEST_INTERVAL - monotonic()
+        if delay > 0:
+            sleep(delay)
+        _last_request_time = monotonic()
+
+def request_segment(keywords: tuple, time_range: tuple, geo: str, cat: str):
+    """
+    Function to request the interest over time of the keywords for a single segment from Google.
+
+    Args:
+    - keywords (tuple): Tuple of keywords for which to get the trends.
+    - time_range (tuple): Tuple containing the start and end dates of the segment.
+    - geo (str): The geolocation for which to get the trends.
+    - cat (str): The pytrends category ("29" = YouTube, "0" = Google Search).
+
+    Returns:
+    - tuple: The dates of the segment (datetime64[ns] array) and the interest of each keyword
+      (float32 array of shape (dates, keywords)).
+    """
+    with _request_semaphore, checkout_trend_req(hl='en-US', tz=360) as pytrends:
+        wait_for_request_slot()
+        pytrends.build_payload(kw_list=list(keywords), timeframe=' '.join(time_range), geo=geo, cat=cat)
+        segment_data = pytrends.interest_over_time()
+
+    # Ensure all keywords are present in the segment data
+    for keyword in keywords:
+        if keyword not in segment_data.columns:
+            segment_data[keyword] = 0  # Add missing keyword column filled with zeros
+
+    # Keep only the keyword columns (dropping isPartial) as plain arrays, matching the stitched output
+    return segment_data.index.to_numpy(dtype='datetime64[ns]'), segment_data[list(keywords)].to_numpy(dtype=np.float32)
+
+# Memoized variant of request_segment without expiry, for segments whose data no longer changes
+cached_request_segment = memory.cache(request_segment)
+
+def fetch_segment(keywords: tuple, time_range: tuple, geo: str, cat: str, max_age_days: int = None):
+    """
+    Function to fetch a single segment through the on-disk cache.
+
+    Entries are keyed on (keywords, time_range, geo, cat). When max_age_days is given, an entry
+    fetched more than max_age_days ago is requested again and overwritten in place.
+
+    Args:
+    - keywords (tuple): Tuple of keywords for which to get the trends.
+    - time_range (tuple): Tuple containing the start and end dates of the segment.
+    - geo (str): The geolocation for which to get the trends.
+    - cat (str): The pytrends category ("29" = YouTube, "0" = Google Search).
+    - max_age_days (int, optional): The maximum age of a cached entry, measured from when it was fetched.
+
+    Returns:
+    - tuple: The dates of the segment and the interest of each keyword, as returned by request_segment.
+    """
+    if max_age_days is None:
+        return cached_request_segment(keywords, time_range, geo, cat)
+
+    expiring_request_segment = memory.cache(request_segment, cache_validation_callback=joblib.expires_after(days=max_age_days))
+    return expiring_request_segment(keywords, time_range, geo, cat)
+
+def fetch_keyword_batches(keywords: tuple, time_range: tuple, geo: str, cat: str, max_age_days: int = None):
+    """
+    Function to fetch a single segment for any number of keywords.
+
+    Keywords beyond the payload limit are fetched in batches that share an anchor keyword (the
+    highest-volume keyword of the first batch), and each batch is rescaled so that its anchor matches
+    the first batch. When the first batch has no interest at all, the later batches are kept unscaled
+    with a warning. Five keywords or fewer take a single request.
+
+    Args:
+    - keywords (tuple): Tuple of keywords for which to get the trends.
+    - time_range (tuple): Tuple containing the start and end dates of the segment.
+    - geo (str): The geolocation for which to get the trends.
+    - cat (str): The pytrends category ("29" = YouTube, "0" = Google Search).
+    - max_age_days (int, optional): The maximum age of the cached responses, see fetch_segment.
+
+    Returns:
+    - tuple: The dates of the segment and the interest of each keyword on a common scale.
+    """
+    index, first_values = fetch_segment(keywords[:MAX_KEYWORDS_PER_PAYLOAD], time_range, geo, cat, max_age_days)
+    if len(keywords) <= MAX_KEYWORDS_PER_PAYLOAD:
+        return index, first_values
+
+    anchor_column = first_values.sum(axis=0).argmax() if len(first_values) else 0
+    anchor_total = first_values[:, anchor_column].sum() if len(first_values) else 0
+    if anchor_total == 0:
+        warnings.warn(f'No interest for {keywords[:MAX_KEYWORDS_PER_PAYLOAD]} in {time_range} to anchor the other keywords; '
+                      'their batches are left unscaled.')
+
+    batch_size = MAX_KEYWORDS_PER_PAYLOAD - 1  # One slot of every later batch is taken by the anchor
+    batches = [
+        (i, keywords[i:i + batch_size], *fetch_segment((keywords[anchor_column],) + keywords[i:i + batch_size], time_range, geo, cat, max_age_days))
+        for i in range(MAX_KEYWORDS_PER_PAYLOAD, len(keywords), batch_size)
+    ]
+
+    if len(index) == 0:
+        # The first batch is empty, so take the dates from the first later batch that has data
+        index = next((batch_index for _, _, batch_index, batch_values in batches if len(batch_values)), index)
+        first_values = np.zeros((len(index), MAX_KEYWORDS_PER_PAYLOAD), dtype=np.float32)
+
+    values = np.zeros((len(index), len(keywords)), dtype=np.float32)
+    values[:, :MAX_KEYWORDS_PER_PAYLOAD] = first_values
+
+    for i, batch_keywords, batch_index, batch_values in batches:
+        if len(batch_values) == 0:
+            warnings.warn(f'No data returned for {batch_keywords} in {time_range}; filling them with zeros.')
+            continue  # The values array is zero-initialized
+
+        if not np.array_equal(batch_index, index):
+            # Align the batch on the dates of the first batch; dates the batch lacks are zero-filled
+            positions = pd.Index(batch_index).get_indexer(index)
+            missing = positions < 0
+            if missing.any():
+                warnings.warn(f'{missing.sum()} dates missing for {batch_keywords} in {time_range}; filling them with zeros.')
+            batch_values = np.where(missing[:, None], 0, batch_values[positions]).astype(np.float32)
+
+        # Scale the batch so its anchor lines up with the anchor of the first batch
+        batch_anchor_total = batch_values[:, 0].sum()
+        scale_factor = anchor_total / batch_anchor_total if anchor_total != 0 and batch_anchor_total != 0 else 1
+        values[:, i:i + batch_size] = batch_values[:, 1:] * scale_factor
+
+    return index, values
+
+@njit(cache=True, fastmath=True)
+def rescale_segments(values, offsets):
+    """
+    Function to scale stitched segments in place so that the last point of each segment meets
+    the first point of the next one, cascading back from the last segment.
+
+    Args:
+    - values (numpy.ndarray): Array of shape (rows, keywords) holding the segments back to back.
+    - offsets (numpy.ndarray): The first row of each segment, followed by the total number of rows.
+    """
+    num_segments = len(offsets) - 1
+    for k in range(values.shape[1]):
+        scale = 1.0
+        for i in range(num_segments - 2, -1, -1):
+            start, end, next_end = offsets[i], offsets[i + 1], offsets[i + 2]
+
+            # The next segment is already scaled, so its first point carries the cumulative factor.
+            # Empty segments and zero boundary values carry no scale information and keep the factor.
+            if end > start and next_end > end and values[end - 1, k] > 0 and values[end, k] > 0:
+                scale = values[end, k] / values[end - 1, k]
+
+            for row in range(start, end):
+                values[row, k] *= scale
+
 def divide_timeframe_range(start_date: str, end_date: str, granularity: str, num_segments: int = None):
     """
     Function to divide the timeframe based on the chosen granularity. 
@@ -52,27 +275,28 @@ def divide_timeframe_range(start_date: str, end_date: str, granularity: str, num
     Returns:
     - list: A list of tuples, each containing the start and end dates for a segment.
     """
-    start_date_obj = datetime.strptime(start_date, '%Y-%m-%d')
-    end_date_obj = datetime.strptime(end_date, '%Y-%m-%d')
+    start_ordinal = datetime.strptime(start_date, '%Y-%m-%d').toordinal()
+    end_ordinal = datetime.strptime(end_date, '%Y-%m-%d').toordinal()
     
     segments = []
-    current_start = start_date_obj
+    current_start = start_ordinal
     
-    total_days = (end_date_obj - start_date_obj).days
+    total_days = end_ordinal - start_ordinal
     
     if num_segments:
-        delta = timedelta(days=total_days // num_segments)
+        delta = total_days // num_segments
     elif granularity == "d":
-        delta = timedelta(days=269)  # Divide into segments of up to 269 days for daily granularity
+        delta = 269  # Divide into segments of up to 269 days for daily granularity
     elif granularity == "w":
-        delta = timedelta(days=1889)  # Divide into segments of up to 1889 days for weekly granularity
+        delta = 1889  # Divide into segments of up to 1889 days for weekly granularity
     else:  # For any other granularity, return the entire date range as one segment
         return [(start_date, end_date)]
     
-    while current_start < end_date_obj:
-        current_end = min(current_start + delta, end_date_obj)
-        segments.append((current_start.strftime('%Y-%m-%d'), current_end.strftime('%Y-%m-%d')))
-        current_start = current_end + timedelta(days=1)  # Start the next segment the day after the current segment ends
+    # Walk the range on plain day ordinals and only build dates when formatting a boundary
+    while current_start < end_ordinal:
+        current_end = min(current_start + delta, end_ordinal)
+        segments.append((date.fromordinal(current_start).isoformat(), date.fromordinal(current_end).isoformat()))
+        current_start = current_end + 1  # Start the next segment the day after the current segment ends
         
     return segments
 
@@ -80,11 +304,15 @@ def divide_timeframe_range(start_date: str, end_date: str, granularity: str, num
 def determine_overall_granularity_from_data(data: pd.DataFrame):
     """Determine the granularity (gap between each datapoint) based on the actual data intervals."""
     
-    # Calculate the differences between consecutive dates in the data
-    date_diffs = data.index.to_series().diff().dropna().dt.days
+    # Calculate the differences in days between consecutive dates in the data
+    date_diffs = np.diff(data.index.values.astype('datetime64[D]').astype(np.int64))
+    
+    # Fewer than two datapoints (e.g. an empty response) have no interval to measure
+    if len(date_diffs) == 0:
+        return "undetermined"
     
-    # Find the most common difference
-    common_diff = date_diffs.mode().iloc[0]
+    # The intervals are uniform, so the median matches the most common difference without a full sort
+    common_diff = np.median(date_diffs)
     
     if common_diff == 1:
         return "daily"
@@ -93,88 +321,154 @@ def determine_overall_granularity_from_data(data: pd.DataFrame):
     else:
         return "monthly"
 
-def get_data(keywords: list, timeframe_range: tuple, geo: str, youtube: bool, granularity: str):
+def stitch_segments(trends_data: list, num_keywords: int):
+    """
+    Function to combine consecutive segments into single, consistently scaled arrays.
+
+    Args:
+    - trends_data (list): List of (dates, values) segments in chronological order.
+    - num_keywords (int): The number of keywords (columns) in each segment.
+
+    Returns:
+    - tuple: The dates of all segments and the combined trends for all keywords over time.
+    """
+    # Stitch the segments into preallocated, contiguous date and value arrays
+    offsets = np.cumsum([0] + [len(segment_index) for segment_index, _ in trends_data])
+    index = np.empty(offsets[-1], dtype='datetime64[ns]')
+    values = np.empty((offsets[-1], num_keywords), dtype=np.float32)
+    for (segment_index, segment_values), start, end in zip(trends_data, offsets[:-1], offsets[1:]):
+        index[start:end] = segment_index
+        values[start:end] = segment_values
+
+    # Adjusting the scaling factor for each segment
+    rescale_segments(values, offsets)
+
+    return index, values
+
+def get_data(keywords: list, timeframe_range: tuple, geo: str, youtube: bool, granularity: str, cache_ttl: int = 1):
     """
     Function to build a payload and return the trends for each keyword over time. 
+    Segments are fetched in parallel, at most MAX_CONCURRENT_REQUESTS at a time.
 
     Args:
     - keywords (list): List of keywords for which to get the trends.
     - timeframe_range (tuple): Tuple containing the start and end dates as strings in 'YYYY-MM-DD' format.
     - geo (str): The geolocation for which to get the trends.
     - youtube (bool): A flag indicating whether to get trends from YouTube (True) or Google Search (False).
+    - granularity (str): The granularity ("d" = "daily", "w" = "weekly").
+    - cache_ttl (int): The number of days after it was fetched that the cached last segment is requested again,
+      as new data keeps arriving at the end of the range (0 = always request it again). This only matters when the
+      range end is fixed; with an end date of today the last segment's cache key already changes every day.
 
     Returns:
     - pandas.DataFrame: A DataFrame containing the combined trends for all keywords over time.
     """
-    pytrends = TrendReq(hl='en-US', tz=360)
+    if cache_ttl < 0:
+        raise ValueError(f"cache_ttl must not be negative, got {cache_ttl}")
+
     segments = divide_timeframe_range(*timeframe_range, granularity)
-    trends_data = []
     
     print("Number of segments:", len(segments))
     
     # granularity = determine_overall_granularity(timeframe_range, len(segments))
     # print(f"Overall granularity: {granularity}")
     
-    for time_range in segments:
-        pytrends.build_payload(kw_list=keywords, timeframe=' '.join(time_range), geo=geo, cat="29" if youtube else "0")
-        segment_data = pytrends.interest_over_time()
-        
-        # Ensure all keywords are present in the segment data
-        for keyword in keywords:
-            if keyword not in segment_data.columns:
-                segment_data[keyword] = 0  # Add missing keyword column filled with zeros
-        
-        trends_data.append(segment_data)
-        
-        # If the number of segments is greater than 20, add a 1s delay
-        if len(segments) > 20:
-            sleep(0.1)
-    
-    # Adjusting the scaling factor for each segment
-    for i in range(1, len(segments)):
-        for keyword in keywords:
-            # Check if the DataFrame is not empty
-            if not trends_data[i].empty:
-                mean_current_start = trends_data[i][keyword].iloc[0]
-            else:
-                mean_current_start = 0  # or some default value
-    
-            # Check if the previous DataFrame is not empty
-            if not trends_data[i-1].empty:
-                mean_previous_end = trends_data[i-1][keyword].iloc[-1]
-            else:
-                mean_previous_end = 0  # or some default value
+    cat = "29" if youtube else "0"
+    # Only the last segment can change as new data arrives, so only its cache entry expires
+    max_ages = [None] * (len(segments) - 1) + [cache_ttl]
+    if len(segments) == 1:
+        # A single segment (e.g. any weekly range up to 1889 days) needs no thread pool and no stitching
+        index, values = fetch_keyword_batches(tuple(keywords), segments[0], geo, cat, max_ages[-1])
+    else:
+        # Segments are independent, so fetch them concurrently; map() keeps them in order
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+            trends_data = list(executor.map(
+                lambda time_range, max_age_days: fetch_keyword_batches(tuple(keywords), time_range, geo, cat, max_age_days),
+                segments, max_ages
+            ))
+        index, values = stitch_segments(trends_data, len(keywords))
     
-            scale_factor = mean_current_start / mean_previous_end if mean_previous_end != 0 else 1
-            trends_data[i-1][keyword] *= scale_factor
-
-    combined_data = pd.concat(trends_data)
+    combined_data = pd.DataFrame(values, index=pd.DatetimeIndex(index, name='date'), columns=keywords)
     
     overall_granularity = determine_overall_granularity_from_data(combined_data)
     print(f"Overall granularity: {overall_granularity}")
     
     return combined_data
 
-def plot_keyword_trends(trends_data, dpi=80, save_figure=False, figure_path='plot.png'):
+def downsample_lttb(x, y, max_points: int):
+    """
+    Function to select the points kept by Largest-Triangle-Three-Buckets (LTTB) downsampling.
+
+    Args:
+    - x (numpy.ndarray): The x values of the series, in ascending order.
+    - y (numpy.ndarray): The y values of the series.
+    - max_points (int): The maximum number of points to keep.
+
+    Returns:
+    - numpy.ndarray: The sorted indices of the points to keep.
+    """
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    # The first and last points are always kept; the inner points are split into equal buckets
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    selected = np.empty(max_points, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+
+    for i in range(max_points - 2):
+        bucket = slice(edges[i], edges[i + 1])
+        next_bucket = slice(edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n)
+        prev_x, prev_y = x[selected[i]], y[selected[i]]
+        next_x, next_y = x[next_bucket].mean(), y[next_bucket].mean()
+
+        # Keep the point forming the largest triangle with the previous pick and the next bucket's average
+        areas = np.abs((prev_x - next_x) * (y[bucket] - prev_y) - (prev_x - x[bucket]) * (next_y - prev_y))
+        selected[i + 1] = edges[i] + areas.argmax()
+
+    return selected
+
+def plot_keyword_trends(trends_data, ax, max_points=2000):
     """
     Function to plot the trends for each keyword over time.
 
     Args:
     - trends_data (dataframe): Dataframe of Google Trends data.
-    - dpi (int): The DPI for the plot.
-    - save_figure (bool): A flag indicating whether to save the figure or not.
-    - figure_path (str): The path to save the figure if save_figure is True.
+    - ax (matplotlib.axes.Axes): The axes to draw on.
+    - max_points (int): The maximum number of points drawn per keyword; longer series are downsampled with LTTB.
     """
 
-    # combined_data = pd.concat(trends_data)
-    fig, ax = plt.subplots(figsize=(10, 6), dpi=dpi)
-    fig.patch.set_facecolor('#19232d')
     ax.set_facecolor('#19232d')
 
     colors = ['#00FFFF', '#FF69B4', '#00ff99', '#ffff99', '#B2DF8A', '#32AA15']
     marker_size = 2  
-    for i, keyword in enumerate(keywords):
-        ax.plot(trends_data.index, trends_data[keyword], label=keyword, linewidth=2, alpha=0.9, color=colors[i % len(colors)], marker='s', markersize=marker_size)
+    # Per-point markers dominate draw time on long series and are invisible at this size, so drop them
+    # and rasterize the lines instead
+    if len(trends_data) > 500:
+        marker, rasterized = None, True
+    else:
+        marker, rasterized = 's', False
+    # Plot dates as matplotlib float days so pandas' datetime converter is bypassed
+    x = mdates.date2num(trends_data.index.to_pydatetime())
+    keyword_colors = [colors[i % len(colors)] for i in range(len(keywords))]
+
+    # Downsample long series, then draw every keyword with a single LineCollection
+    segments = []
+    for keyword in keywords:
+        y = trends_data[keyword].to_numpy()
+        kept = downsample_lttb(x, y, max_points)
+        segments.append(np.column_stack([x[kept], y[kept]]))
+
+    lines = LineCollection(segments, colors=keyword_colors, linewidths=2, alpha=0.9, rasterized=rasterized)
+    ax.add_collection(lines)
+    if marker:
+        ax.scatter(np.concatenate([segment[:, 0] for segment in segments]), np.concatenate([segment[:, 1] for segment in segments]),
+                   c=np.repeat(keyword_colors, [len(segment) for segment in segments]), marker=marker, s=marker_size ** 2, alpha=0.9)
+    ax.autoscale_view()
+
+    # The collection has no per-keyword artists, so the legend uses proxy lines
+    legend_handles = [Line2D([], [], color=color, linewidth=2, marker=marker, markersize=marker_size, label=keyword)
+                      for keyword, color in zip(keywords, keyword_colors)]
 
     title = f'Google Trends - Keyword Trends\nTimeframe: {timeframe_range[0]} to {timeframe_range[1]}'
     title += '' if geo == '' else f'  Geolocation: {geo}'
@@ -182,55 +476,55 @@ def plot_keyword_trends(trends_data, dpi=80, save_figure=False, figure_path='plo
 
     ax.set_title(title, color='white')
     ax.set_ylabel('Interest over Time', color='white')
-    ax.legend()
+    ax.legend(handles=legend_handles)
     ax.tick_params(colors='white')
     ax.xaxis.label.set_color('white')
     ax.yaxis.label.set_color('white')
-    plt.xticks(rotation=45, color='white')
-    plt.yticks(color='white')
+    ax.tick_params(axis='x', labelrotation=45)
 
     years = mdates.YearLocator()   
     years_fmt = mdates.DateFormatter('%Y')
     ax.xaxis.set_major_locator(years)
     ax.xaxis.set_major_formatter(years_fmt)
 
-    # Enable cursor functionality
-    cursor = mplcursors.cursor(ax)
-    cursor.connect("add", lambda sel: sel.annotation.set_text(
-        'Date: {}\nInterest: {:.2f}'.format(mdates.num2date(sel.target[0]).strftime('%Y-%m-%d'), sel.target[1])
-    ))
+    # Enable cursor functionality, snapping to the nearest original point of the hovered keyword.
+    # The annotation texts are formatted once up front instead of on every hover.
+    dates = trends_data.index.strftime('%Y-%m-%d')
+    labels = [[f'Date: {d}\nInterest: {v:.2f}' for d, v in zip(dates, trends_data[keyword].to_numpy())] for keyword in keywords]
 
-    plt.tight_layout()
-    if save_figure:
-        plt.savefig(figure_path, dpi=dpi, facecolor='#19232d', edgecolor='#19232d')
-    else:
-        plt.show()
+    def annotate(sel):
+        path_index, _ = sel.index  # LineCollection picks are (path index, index within the path)
+        nearest = np.abs(x - sel.target[0]).argmin()
+        sel.annotation.set_text(labels[path_index][nearest])
 
-def plot_interest_ratio(trends_data, dpi=80, save_figure=False, figure_path='plot.png'):
+    cursor = mplcursors.cursor(lines)
+    cursor.connect("add", annotate)
+
+def plot_interest_ratio(trends_data, ax):
     """
     Function to plot the ratio of search interest of Keyword 1 over Keyword 2 over time.
 
     Args:
     - trends_data (pandas.DataFrame): Dataframe of Google Trends data.
-    - dpi (int): The DPI for the plot.
-    - save_figure (bool): A flag indicating whether to save the figure or not.
-    - figure_path (str): The path to save the figure if save_figure is True.
+    - ax (matplotlib.axes.Axes): The axes to draw on.
     """
 
     keyword1 = trends_data.columns[0]
     keyword2 = trends_data.columns[1]
 
-    # Calculate ratio
-    ratio_data = trends_data[keyword1] / trends_data[keyword2]
+    # Calculate ratio on the raw arrays; points where keyword 2 has no interest are left as NaN gaps
+    interest1 = trends_data[keyword1].to_numpy(np.float32)
+    interest2 = trends_data[keyword2].to_numpy(np.float32)
+    ratio_data = np.full_like(interest1, np.nan)
+    np.divide(interest1, interest2, out=ratio_data, where=interest2 != 0)
 
     # Plotting
-    fig, ax = plt.subplots(figsize=(10, 6), dpi=dpi)
-    fig.patch.set_facecolor('#19232d')
     ax.set_facecolor('#19232d')
 
     legend_label = f'{keyword1}\n/{keyword2}'
     
-    ax.plot(ratio_data.index, ratio_data.values, label=legend_label, color='#FFA07A')
+    x = mdates.date2num(trends_data.index.to_pydatetime())
+    ax.plot(x, ratio_data, label=legend_label, color='#FFA07A')
 
     title_line_1 = f'Interest Ratio Over Time ({timeframe_range[0]} - {timeframe_range[1]})'
     title_line_2 = f'Keyword 1: {keyword1}\nKeyword 2: {keyword2}'
@@ -240,24 +534,41 @@ def plot_interest_ratio(trends_data, dpi=80, save_figure=False, figure_path='plo
     ax.tick_params(colors='white')
     ax.xaxis.label.set_color('white')
     ax.yaxis.label.set_color('white')
-    plt.xticks(rotation=45, color='white')
-    plt.yticks(color='white')
+    ax.tick_params(axis='x', labelrotation=45)
 
     years = mdates.YearLocator()   
     years_fmt = mdates.DateFormatter('%Y')
     ax.xaxis.set_major_locator(years)
     ax.xaxis.set_major_formatter(years_fmt)
 
-    # Enable cursor functionality
+    # Enable cursor functionality, with the annotation texts formatted once up front
+    labels = [f'Date: {d}\nRatio: {v:.2f}' for d, v in zip(trends_data.index.strftime('%Y-%m-%d'), ratio_data)]
     cursor = mplcursors.cursor(ax)
-    cursor.connect("add", lambda sel: sel.annotation.set_text(
-        'Date: {}\nRatio: {:.2f}'.format(mdates.num2date(sel.target[0]).strftime('%Y-%m-%d'), sel.target[1])
-    ))
+    cursor.connect("add", lambda sel: sel.annotation.set_text(labels[int(round(sel.index))]))
+
+def plot_trends(trends_data, dpi=80, save_figure=False, figure_path='plot.png', max_points=2000):
+    """
+    Function to plot the keyword trends and the interest ratio as two panels of a single figure.
+
+    Args:
+    - trends_data (pandas.DataFrame): Dataframe of Google Trends data.
+    - dpi (int): The DPI for the plot.
+    - save_figure (bool): A flag indicating whether to save the figure or not.
+    - figure_path (str): The path to save the figure if save_figure is True.
+    - max_points (int): The maximum number of points drawn per keyword; longer series are downsampled with LTTB.
+    """
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 12), dpi=dpi)
+    fig.patch.set_facecolor('#19232d')
+
+    plot_keyword_trends(trends_data, ax1, max_points=max_points)
+    plot_interest_ratio(trends_data, ax2)
 
     plt.tight_layout()
     if save_figure:
-        plt.savefig(figure_path)
-    plt.show()
+        plt.savefig(figure_path, dpi=dpi, facecolor='#19232d', edgecolor='#19232d')
+        plt.close(fig)  # Release the figure and its canvas
+    else:
+        plt.show()
 
 def export_data_as_csv(df,csv_name):
     """
@@ -288,8 +599,7 @@ granularity = 'w' # 'w' for weekly, 'd' = daily, else = default
 
 # Call the function with the defined parameters
 trends_data = get_data(keywords, timeframe_range, geo, youtube, granularity)
-plot_keyword_trends(trends_data, dpi=120, save_figure=False, figure_path='plot.png')
-plot_interest_ratio(trends_data, dpi=120, save_figure=False, figure_path='plot.png')
+plot_trends(trends_data, dpi=120, save_figure=SAVE_ONLY, figure_path='plot.png')
 # export_data_as_csv(trends_data,"Google_Trends_Data.csv")
 
 start_date = datetime.strptime(timeframe_range[0], '%Y-%m-%d').date()